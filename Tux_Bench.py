@@ -8,6 +8,16 @@ import math
 import subprocess
 import threading
 import queue
+import sys
+import io
+import json
+import cProfile
+import pstats
+
+PROFILE_DIR = "tuxbench_profile"
+PROFILE_MODES = ("cprofile", "sample")
+RAY_STAT_KEYS = ("rays", "shadow_rays", "bounces", "intersection_tests")
+ray_stats = None # Hot-path counters, only allocated in profiling mode
 
 # --- Helper Math ---
 def vec_sub(v1, v2): return (v1[0]-v2[0], v1[1]-v2[1], v1[2]-v2[2])
@@ -24,6 +34,8 @@ def vec_reflect(v, n):
     return vec_sub(v, vec_mul(n, 2.0 * dot))
 
 # --- CPU Ray Tracing Workers ---
+AA_SAMPLES = 8 # Anti-aliasing samples per pixel
+
 def intersect_scene(ray_origin, ray_dir, spheres):
     t_min = 99999.0
     hit_obj = None
@@ -43,6 +55,7 @@ def intersect_scene(ray_origin, ray_dir, spheres):
 def trace_ray(ray_origin, ray_dir, spheres, light_pos, depth):
     if depth <= 0: return (0, 0, 0)
     t, hit_obj = intersect_scene(ray_origin, ray_dir, spheres)
+    if ray_stats is not None: ray_stats["intersection_tests"] += len(spheres)
     if hit_obj is None: return (10, 10, 15) # Darker background
 
     hit_point = vec_add(ray_origin, vec_mul(ray_dir, t))
@@ -55,6 +68,9 @@ def trace_ray(ray_origin, ray_dir, spheres, light_pos, depth):
 
     shadow_origin = vec_add(hit_point, vec_mul(normal, 0.001))
     shadow_t, shadow_obj = intersect_scene(shadow_origin, to_light, spheres)
+    if ray_stats is not None:
+        ray_stats["shadow_rays"] += 1
+        ray_stats["intersection_tests"] += len(spheres)
 
     in_shadow = False
     if shadow_obj and shadow_t < dist_to_light: in_shadow = True
@@ -67,6 +83,7 @@ def trace_ray(ray_origin, ray_dir, spheres, light_pos, depth):
 
     reflectivity = hit_obj[5]
     if reflectivity > 0:
+        if ray_stats is not None: ray_stats["bounces"] += 1
         reflected_dir = vec_reflect(ray_dir, normal)
         ref_col = trace_ray(shadow_origin, reflected_dir, spheres, light_pos, depth - 1)
         return (local[0]*(1-reflectivity) + ref_col[0]*reflectivity,
@@ -75,7 +92,20 @@ def trace_ray(ray_origin, ray_dir, spheres, light_pos, depth):
     else:
         return local
 
-def render_worker(task_queue, result_queue, stop_event):
+def render_worker(task_queue, result_queue, stop_event, profile_dir=None, profile_mode="cprofile"):
+    global ray_stats
+    # A forked child inherits the parent's profiler when the UI runs under --profile
+    disable_inherited_profiler()
+    if profile_dir is None:
+        render_tiles(task_queue, result_queue, stop_event)
+    else:
+        ray_stats = dict.fromkeys(RAY_STAT_KEYS, 0)
+        collector = run_profiled(profile_mode, render_tiles, task_queue, result_queue, stop_event)
+        save_profile(profile_dir, f"worker_{os.getpid()}", collector, ray_stats)
+    # Once stopped nobody reads the remaining tiles, don't block exit flushing them
+    result_queue.cancel_join_thread()
+
+def render_tiles(task_queue, result_queue, stop_event):
     # Updated Colors for CPU Test as well (Neon)
     spheres = [
         (0.0, -0.2, 3.0, 0.8, (0, 255, 255), 0.5),    # Cyan
@@ -92,7 +122,8 @@ def render_worker(task_queue, result_queue, stop_event):
         light_pos = (lx, 10.0, -5.0)
         block_data = []
         aspect = width / height
-        samples = 8
+        samples = AA_SAMPLES
+        if ray_stats is not None: ray_stats["rays"] += tw * th * samples
         for y in range(ty, ty + th):
             row = []
             for x in range(tx, tx + tw):
@@ -107,12 +138,345 @@ def render_worker(task_queue, result_queue, stop_event):
                 fc = (int(min(255, ar/samples)), int(min(255, ag/samples)), int(min(255, ab/samples)))
                 row.append(f"#{fc[0]:02x}{fc[1]:02x}{fc[2]:02x}")
             block_data.append(row)
-        result_queue.put((tx, ty, block_data))
+        result_queue.put((tx, ty, block_data, os.getpid()))
+
+# --- Profiling ---
+class StackSampler(threading.Thread):
+    """Periodically samples the creating thread's stack into collapsed (flamegraph) form."""
+    def __init__(self, interval=0.005, idle_leaf=None):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.idle_leaf = idle_leaf # Samples stopped in this function are idle waiting, not work
+        self.target_id = threading.get_ident()
+        self.stacks = {}
+        self.halt = threading.Event()
+
+    def run(self):
+        while not self.halt.wait(self.interval):
+            frame = sys._current_frames().get(self.target_id)
+            if frame is not None and frame.f_code.co_name == self.idle_leaf: continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def stop(self):
+        self.halt.set()
+        self.join()
+
+def run_profiled(mode, func, *args, idle_leaf=None):
+    # cProfile and the sampler are exclusive so neither measures the other's overhead
+    if mode == "sample":
+        sampler = StackSampler(idle_leaf=idle_leaf)
+        sampler.start()
+        try: func(*args)
+        finally: sampler.stop()
+        return sampler
+    profiler = cProfile.Profile()
+    profiler.runcall(func, *args)
+    return profiler
+
+def disable_inherited_profiler():
+    sys.setprofile(None)
+    # Python 3.12+ cProfile registers through sys.monitoring instead of setprofile
+    monitoring = getattr(sys, "monitoring", None)
+    if monitoring and monitoring.get_tool(monitoring.PROFILER_ID) is not None:
+        monitoring.set_events(monitoring.PROFILER_ID, 0)
+        monitoring.free_tool_id(monitoring.PROFILER_ID)
+
+def is_profile_file(name):
+    # Only files written by save_profile / write_profile_report
+    if name == "report.txt": return True
+    stem, ext = os.path.splitext(name)
+    if ext not in (".prof", ".collapsed", ".json"): return False
+    return stem in ("main", "merged") or stem.startswith("worker_")
+
+def prepare_profile_dir(path=PROFILE_DIR):
+    path = os.path.abspath(path)
+    os.makedirs(path, exist_ok=True)
+    # Drop results of a previous session so the merged report only covers this run
+    for f in os.listdir(path):
+        if is_profile_file(f): os.remove(os.path.join(path, f))
+    return path
+
+def save_profile(profile_dir, name, collector, counters=None):
+    if isinstance(collector, StackSampler):
+        with open(os.path.join(profile_dir, name + ".collapsed"), "w") as f:
+            for stack, count in collector.stacks.items(): f.write(f"{stack} {count}\n")
+    else:
+        collector.dump_stats(os.path.join(profile_dir, name + ".prof"))
+    if counters is not None:
+        with open(os.path.join(profile_dir, name + ".json"), "w") as f:
+            json.dump(counters, f)
+
+def write_profile_report(profile_dir):
+    names = sorted(f for f in os.listdir(profile_dir) if is_profile_file(f) and not f.startswith("merged"))
+    broken = []
+
+    # Load each profile on its own, a worker killed while saving leaves a truncated file
+    stats = None
+    prof_count = 0
+    for f in names:
+        if not f.endswith(".prof"): continue
+        path = os.path.join(profile_dir, f)
+        try:
+            if stats is None: stats = pstats.Stats(path)
+            else: stats.add(path)
+            prof_count += 1
+        except Exception: broken.append(f)
+    if stats is not None: stats.dump_stats(os.path.join(profile_dir, "merged.prof"))
+
+    stacks = {}
+    collapsed_count = 0
+    for f in names:
+        if not f.endswith(".collapsed"): continue
+        collapsed_count += 1
+        with open(os.path.join(profile_dir, f)) as f_obj:
+            for line in f_obj:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                try: stacks[stack] = stacks.get(stack, 0) + int(count)
+                except ValueError: continue
+    if stacks:
+        with open(os.path.join(profile_dir, "merged.collapsed"), "w") as f:
+            for stack, count in sorted(stacks.items()): f.write(f"{stack} {count}\n")
+    if stats is None and not stacks and not broken: return None
+
+    totals = dict.fromkeys(RAY_STAT_KEYS, 0)
+    workers = 0
+    for f in names:
+        if not f.endswith(".json"): continue
+        try:
+            with open(os.path.join(profile_dir, f)) as f_obj: counters = json.load(f_obj)
+        except (OSError, ValueError):
+            broken.append(f)
+            continue
+        workers += 1
+        for k in RAY_STAT_KEYS: totals[k] += counters.get(k, 0)
+
+    out = io.StringIO()
+    out.write(f"Tux Bench profile: {prof_count + collapsed_count} processes ({workers} render workers)\n")
+    if broken: out.write(f"Skipped unreadable files: {', '.join(broken)}\n")
+    out.write("\nHot-path counters\n")
+    for k in RAY_STAT_KEYS: out.write(f"  {k:<20}{totals[k]:>16,}\n")
+    out.write("\n")
+    if stacks:
+        # Self time per function: the leaf frame of each sampled stack
+        leaves = {}
+        for stack, count in stacks.items():
+            leaf = stack.rpartition(";")[2]
+            leaves[leaf] = leaves.get(leaf, 0) + count
+        total = sum(leaves.values())
+        out.write(f"Sampled self time ({total} samples)\n")
+        for leaf, count in sorted(leaves.items(), key=lambda x: x[1], reverse=True)[:30]:
+            out.write(f"  {count / total * 100:>6.1f}%  {leaf}\n")
+        out.write("\n")
+    if stats is not None:
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(30)
+    report = out.getvalue()
+    with open(os.path.join(profile_dir, "report.txt"), "w") as f: f.write(report)
+    return report
+
+# --- Core Scaling Sweep ---
+SWEEP_WIDTH, SWEEP_HEIGHT, SWEEP_TILE = 240, 180, 12
+SWEEP_WARMUP = 0.5 # Seconds of full load before measuring
+SWEEP_MEASURE = 5.0 # Measured seconds per step, frames repeat until it's over
+SWEEP_CLOCK_INTERVAL = 0.1
+SWEEP_START_TIMEOUT = 30.0 # Give up if the workers haven't all delivered a tile by then
+SWEEP_STOP_TIMEOUT = 2.0 # Shared deadline for all workers to exit after a step
+
+def read_cpu_mhz():
+    # Current clock per logical CPU as {cpu: MHz}
+    mhz = {}
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu = None
+            for l in f:
+                if l.startswith("processor"): cpu = int(l.split(":")[1].strip())
+                elif "cpu MHz" in l and cpu is not None: mhz[cpu] = float(l.split(":")[1].strip())
+    except: pass
+    if not mhz:
+        # ARM kernels don't report MHz in cpuinfo, fall back to cpufreq
+        try:
+            base = "/sys/devices/system/cpu"
+            for cpu in os.listdir(base):
+                path = os.path.join(base, cpu, "cpufreq", "scaling_cur_freq")
+                if cpu.startswith("cpu") and cpu[3:].isdigit() and os.path.exists(path):
+                    try:
+                        with open(path) as f: mhz[int(cpu[3:])] = int(f.read().strip()) / 1000
+                    except: pass
+        except: pass
+    return mhz
+
+def read_cpu_busy():
+    # Busy (non-idle, non-iowait) jiffies per logical CPU from /proc/stat
+    busy = {}
+    try:
+        with open("/proc/stat") as f:
+            for l in f:
+                parts = l.split()
+                if not (parts and parts[0].startswith("cpu") and parts[0][3:].isdigit()): continue
+                ticks = [int(v) for v in parts[1:]]
+                busy[int(parts[0][3:])] = sum(ticks) - ticks[3] - (ticks[4] if len(ticks) > 4 else 0)
+    except: pass
+    return busy
+
+def usable_cpus():
+    # Respects taskset / cgroup cpusets, unlike cpu_count()
+    try: return len(os.sched_getaffinity(0))
+    except: return multiprocessing.cpu_count()
+
+def physical_core_cpus():
+    # One logical CPU per core, i.e. no SMT siblings. None if topology is unknown.
+    try: allowed = os.sched_getaffinity(0)
+    except: allowed = None
+    cores = {}
+    try:
+        base = "/sys/devices/system/cpu"
+        for cpu in os.listdir(base):
+            if not (cpu.startswith("cpu") and cpu[3:].isdigit()): continue
+            n = int(cpu[3:])
+            if allowed is not None and n not in allowed: continue
+            # core_id isn't unique per package on multi-die parts, the sibling list is
+            siblings = None
+            for name in ("core_cpus_list", "thread_siblings_list"):
+                try:
+                    with open(os.path.join(base, cpu, "topology", name)) as f: siblings = f.read().strip()
+                    break
+                except: pass
+            if siblings is None: continue
+            cores[siblings] = min(n, cores.get(siblings, n))
+    except: pass
+    return sorted(cores.values()) or None
+
+def worker_steps(n):
+    steps, k = [], 1
+    while k < n:
+        steps.append(k)
+        k *= 2
+    steps.append(n)
+    return steps
+
+def run_sweep_step(workers, cpus=None, cancel=None):
+    """Keeps `workers` processes rendering for SWEEP_MEASURE seconds, returns (seconds, tiles, samples, MHz) or None if cancelled."""
+    stop_event = multiprocessing.Event()
+    task_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+    procs = []
+    try:
+        for i in range(workers):
+            p = multiprocessing.Process(target=render_worker, args=(task_queue, result_queue, stop_event))
+            p.daemon = True; p.start(); procs.append(p)
+            if cpus:
+                try: os.sched_setaffinity(p.pid, {cpus[i]})
+                except: pass
+
+        tiles = []
+        for y in range(0, SWEEP_HEIGHT, SWEEP_TILE):
+            for x in range(0, SWEEP_WIDTH, SWEEP_TILE):
+                tiles.append((x, y, min(SWEEP_TILE, SWEEP_WIDTH - x), min(SWEEP_TILE, SWEEP_HEIGHT - y), SWEEP_WIDTH, SWEEP_HEIGHT, 1.0))
+        start = time.time()
+        queued = done = counted = samples = 0
+        measure_start = busy_before = None
+        started = set()
+        clocks = {}
+        while True:
+            if cancel and cancel.is_set(): return None
+            if not all(p.is_alive() for p in procs): raise RuntimeError(f"A sweep worker exited unexpectedly at {workers} workers")
+            now = time.time()
+            # Keep a frame's worth of work queued so no worker idles at the end of a pass
+            if queued - done < len(tiles):
+                for t in tiles: task_queue.put(t)
+                queued += len(tiles)
+            if measure_start is None:
+                # Every worker has delivered a tile and the load has settled
+                if len(started) >= workers and now - start >= SWEEP_WARMUP:
+                    measure_start = next_clock = now
+                    busy_before = read_cpu_busy()
+                elif now - start >= SWEEP_START_TIMEOUT:
+                    raise RuntimeError(f"Only {len(started)} of {workers} workers started within {SWEEP_START_TIMEOUT:.0f}s")
+            else:
+                if now - measure_start >= SWEEP_MEASURE: break
+                if now >= next_clock:
+                    for cpu, mhz in read_cpu_mhz().items(): clocks.setdefault(cpu, []).append(mhz)
+                    next_clock += SWEEP_CLOCK_INTERVAL
+            try:
+                _, _, data, pid = result_queue.get(timeout=0.02)
+                done += 1
+                started.add(pid)
+                if measure_start is not None:
+                    counted += 1
+                    samples += len(data) * len(data[0]) * AA_SAMPLES
+            except queue.Empty: pass
+        elapsed = time.time() - measure_start
+        busy_after = read_cpu_busy()
+    finally:
+        stop_event.set()
+        try:
+            while True: task_queue.get_nowait()
+        except: pass
+        task_queue.cancel_join_thread()
+        # Keep draining results so no worker blocks on a full pipe, all against one deadline
+        deadline = time.time() + SWEEP_STOP_TIMEOUT
+        while time.time() < deadline and any(p.is_alive() for p in procs):
+            try: result_queue.get(timeout=0.05)
+            except queue.Empty: pass
+        for p in procs:
+            if p.is_alive(): p.terminate()
+        for p in procs: p.join()
+
+    # Clock of the CPUs doing the work: the pinned ones, else the busiest ones
+    if cpus: loaded = cpus[:workers]
+    elif busy_before and busy_after:
+        loaded = sorted(busy_after, key=lambda c: busy_after[c] - busy_before.get(c, 0), reverse=True)[:workers]
+    else:
+        loaded = sorted(clocks, key=lambda c: sum(clocks[c]), reverse=True)[:workers]
+    readings = [m for c in loaded for m in clocks.get(c, [])]
+    return elapsed, counted, samples, sum(readings) / len(readings) if readings else 0.0
+
+def run_scaling_sweep(physical_only=False, progress=print, cancel=None):
+    """Runs the CPU tracer at 1, 2, 4 ... N workers. Returns a list of result dicts."""
+    cpus = None
+    if physical_only:
+        cpus = physical_core_cpus()
+        if cpus is None: raise RuntimeError("CPU topology not available in /sys, cannot select physical cores")
+    total = len(cpus) if cpus else usable_cpus()
+    rows = []
+    for n in worker_steps(total):
+        progress(f"Running {n} worker(s)...")
+        step = run_sweep_step(n, cpus, cancel)
+        if step is None: break
+        elapsed, tiles, samples, mhz = step
+        rows.append({"workers": n, "tiles": tiles, "throughput": samples / elapsed / 1000, "mhz": mhz})
+    if rows:
+        base = rows[0]["throughput"]
+        for r in rows:
+            r["speedup"] = r["throughput"] / base
+            r["efficiency"] = r["speedup"] / r["workers"]
+    return rows
+
+def format_scaling_report(rows, physical_only=False):
+    mode = "physical cores only" if physical_only else "all hardware threads"
+    lines = [f"CPU scaling sweep ({mode}, {SWEEP_WIDTH}x{SWEEP_HEIGHT} @ {AA_SAMPLES}x AA, {SWEEP_MEASURE:.0f}s per step)", "",
+             f"{'Workers':>7}  {'Tiles':>7}  {'kSamples/s':>10}  {'Clock':>9}  {'Speedup':>7}  {'Efficiency':>10}"]
+    for r in rows:
+        clock = f"{r['mhz']/1000:.2f} GHz" if r["mhz"] else "N/A"
+        lines.append(f"{r['workers']:>7}  {r['tiles']:>7}  {r['throughput']:>10.1f}  {clock:>9}  {r['speedup']:>6.2f}x  {r['efficiency']*100:>9.1f}%")
+    if rows:
+        st, mt = rows[0]["throughput"], rows[-1]["throughput"]
+        lines += ["", f"Single-thread score: {int(st)}", f"Multi-thread score:  {int(mt)} ({mt/st:.2f}x at {rows[-1]['workers']} workers)"]
+    return "\n".join(lines)
 
 # --- Main App ---
 class TuxBench(tk.Tk):
-    def __init__(self):
+    def __init__(self, profile_dir=None, profile_mode="cprofile"):
         super().__init__()
+        self.profile_dir = profile_dir
+        self.profile_mode = profile_mode
         self.title("Tux Bench")
         self.geometry("1000x800")
         self.minsize(900, 700)
@@ -120,11 +484,14 @@ class TuxBench(tk.Tk):
                        "accent": "#3584e4", "danger": "#e01b24", "success": "#33d17a"}
         self.configure(bg=self.colors["bg"])
         self.cpu_stress_window = None
+        self.scaling_window = None
+        self.sweep_thread = None
         self.cpu_model, self.cpu_cache = self.get_cpu_info()
         self.gpu_model, self.gpu_driver = self.detect_gpu_detailed()
         self.setup_styles()
         self.create_layout()
         self.update_stats()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_styles(self):
         self.style = ttk.Style(self)
@@ -179,7 +546,11 @@ class TuxBench(tk.Tk):
         self.btn_stress_cpu = ttk.Button(ctrl, text="Start CPU Stress Test", style="Accent.TButton", command=self.toggle_cpu_stress)
         self.btn_stress_cpu.pack(fill="x", pady=10)
         self.lbl_stress_status = tk.Label(ctrl, text="Status: Idle", bg=self.colors["card"], fg="#9a9996")
-        self.lbl_stress_status.pack(pady=(0, 20))
+        self.lbl_stress_status.pack(pady=(0, 10))
+
+        self.btn_scaling = ttk.Button(ctrl, text="Core Scaling Sweep", style="Accent.TButton", command=self.launch_scaling)
+        self.btn_scaling.pack(fill="x", pady=5)
+        tk.Label(ctrl, text="Speedup & Parallel Efficiency at 1, 2, 4 ... N Workers", bg=self.colors["card"], fg="#9a9996", font=("Cantarell", 9)).pack(pady=(0, 20))
 
         ttk.Separator(ctrl, orient="horizontal").pack(fill="x", pady=10)
         tk.Label(ctrl, text="GPU / 3D Graphics", font=("Cantarell", 11, "bold"), bg=self.colors["card"], fg=self.colors["fg"]).pack(anchor="w", pady=(5, 5))
@@ -324,8 +695,11 @@ class TuxBench(tk.Tk):
 
     def toggle_cpu_stress(self):
         if self.cpu_stress_window:
-            self.cpu_stress_window.destroy()
-            self.cpu_stress_window = None
+            # Window clears itself from update_stats once its workers are gone
+            self.cpu_stress_window.shutdown()
+            self.lbl_stress_status.config(text="Status: Stopping...", fg=self.colors["fg"])
+        elif self.sweep_running():
+            messagebox.showwarning("Tux Bench", "A Core Scaling Sweep is running. Wait for it to finish first.", parent=self)
         else:
             self.cpu_stress_window = CpuRenderWindow(self)
             self.btn_stress_cpu.config(text="STOP CPU STRESS", style="Danger.TButton")
@@ -334,6 +708,98 @@ class TuxBench(tk.Tk):
     def launch_reactor(self):
         ReactorCoreWindow(self)
 
+    def sweep_running(self):
+        # Outlives its window: a cancelled sweep still has workers to tear down
+        return bool(self.sweep_thread and self.sweep_thread.is_alive())
+
+    def watch_sweep(self):
+        if self.sweep_running(): self.after(200, self.watch_sweep)
+        else: self.btn_stress_cpu.state(["!disabled"])
+
+    def on_close(self):
+        if self.scaling_window and self.scaling_window.winfo_exists(): self.scaling_window.cancel.set()
+        # Stop workers first so they can save their profiles before the report is merged
+        if self.cpu_stress_window and self.cpu_stress_window.winfo_exists():
+            self.cpu_stress_window.shutdown(on_done=self.destroy)
+        else:
+            self.destroy()
+
+    def launch_scaling(self):
+        if self.scaling_window and self.scaling_window.winfo_exists():
+            self.scaling_window.lift()
+        else:
+            self.scaling_window = ScalingSweepWindow(self)
+
+# --- Core Scaling Sweep Window ---
+class ScalingSweepWindow(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Core Scaling Sweep")
+        self.geometry("720x480")
+        self.configure(bg="#111111")
+        self.parent = parent
+
+        bar = tk.Frame(self, bg="#111111")
+        bar.pack(fill="x", padx=10, pady=10)
+        self.physical_only = tk.BooleanVar(value=False)
+        tk.Checkbutton(bar, text="Physical cores only (no SMT)", variable=self.physical_only, bg="#111111", fg="white",
+                       selectcolor="#111111", activebackground="#111111", activeforeground="white").pack(side="left")
+        self.btn_start = ttk.Button(bar, text="Start Sweep", style="Accent.TButton", command=self.start_sweep)
+        self.btn_start.pack(side="right")
+
+        self.txt = tk.Text(self, bg="black", fg="white", font=("Monospace", 10), relief="flat")
+        self.txt.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        self.msg_queue = queue.Queue()
+        self.cancel = threading.Event()
+        self.thread = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def start_sweep(self):
+        if self.parent.sweep_running(): return
+        # Any other load on the CPUs makes every number meaningless
+        if self.parent.cpu_stress_window:
+            messagebox.showwarning("Core Scaling Sweep", "Stop the CPU Stress Test before running a sweep.", parent=self)
+            return
+        physical_only = self.physical_only.get()
+        if physical_only and physical_core_cpus() is None:
+            messagebox.showerror("Core Scaling Sweep", "CPU topology is not available in /sys, cannot select physical cores.", parent=self)
+            return
+        self.btn_start.state(["disabled"])
+        self.txt.delete("1.0", "end")
+        self.thread = threading.Thread(target=self.sweep, args=(physical_only,), daemon=True)
+        self.thread.start()
+        self.parent.sweep_thread = self.thread
+        self.parent.btn_stress_cpu.state(["disabled"])
+        self.parent.watch_sweep()
+        self.poll_messages()
+
+    def sweep(self, physical_only):
+        try:
+            rows = run_scaling_sweep(physical_only, self.msg_queue.put, self.cancel)
+            self.msg_queue.put("\n" + format_scaling_report(rows, physical_only))
+        except Exception as e:
+            self.msg_queue.put(f"\nSweep failed: {e}")
+        finally:
+            self.msg_queue.put(None)
+
+    def poll_messages(self):
+        if self.cancel.is_set(): return
+        try:
+            while True:
+                msg = self.msg_queue.get_nowait()
+                if msg is None:
+                    self.btn_start.state(["!disabled"])
+                    return
+                self.txt.insert("end", msg + "\n")
+                self.txt.see("end")
+        except queue.Empty: pass
+        self.after(200, self.poll_messages)
+
+    def on_close(self):
+        self.cancel.set()
+        self.destroy()
+
 # --- Reactor Core Engine ---
 class ReactorCoreWindow(tk.Toplevel):
     def __init__(self, parent):
@@ -619,11 +1085,15 @@ class CpuRenderWindow(tk.Toplevel):
         self.lbl_info = tk.Label(self, text="Pass: 1 | Time: 00:00", bg="black", fg="white", font=("Monospace", 12))
         self.lbl_info.place(x=10, y=10)
 
+        self.profile_dir = parent.profile_dir
+        self.profile_mode = parent.profile_mode
         self.start_time = time.time()
         self.stop_event = multiprocessing.Event()
         self.task_queue = multiprocessing.Queue()
         self.result_queue = multiprocessing.Queue()
         self.workers = []
+        self.stopping = False
+        self.on_stopped = []
 
         self.tile_size = 40
         self.completed_tiles = 0
@@ -635,6 +1105,7 @@ class CpuRenderWindow(tk.Toplevel):
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def start_render_cycle(self):
+        if self.stop_event.is_set(): return
         self.canvas.delete("all")
         self.img = tk.PhotoImage(width=800, height=600)
         self.canvas.create_image(0, 0, image=self.img, anchor="nw")
@@ -651,7 +1122,7 @@ class CpuRenderWindow(tk.Toplevel):
 
         if not self.workers:
             for _ in range(multiprocessing.cpu_count()):
-                p = multiprocessing.Process(target=render_worker, args=(self.task_queue, self.result_queue, self.stop_event))
+                p = multiprocessing.Process(target=render_worker, args=(self.task_queue, self.result_queue, self.stop_event, self.profile_dir, self.profile_mode))
                 p.daemon = True; p.start(); self.workers.append(p)
         self.after(100, self.poll_results)
 
@@ -662,7 +1133,7 @@ class CpuRenderWindow(tk.Toplevel):
 
         for _ in range(20):
             try:
-                rx, ry, data = self.result_queue.get_nowait()
+                rx, ry, data, _ = self.result_queue.get_nowait()
                 self.img.put(data, to=(rx, ry))
                 self.completed_tiles += 1
             except: break
@@ -676,14 +1147,62 @@ class CpuRenderWindow(tk.Toplevel):
             self.after(10, self.poll_results)
 
     def on_close(self):
+        self.shutdown()
+
+    def shutdown(self, on_done=None):
+        # Single stop path for the close button, STOP CPU STRESS and app exit
+        if on_done: self.on_stopped.append(on_done)
+        if self.stopping: return
+        self.stopping = True
         self.stop_event.set()
         try:
             while True: self.task_queue.get_nowait()
         except: pass
+        if self.profile_dir:
+            # Let workers finish their current tile and write their stats
+            self.lbl_info.config(text="Writing profile...")
+            self.stop_deadline = time.time() + 30.0
+            self.wait_for_workers()
+        else:
+            self.finish_shutdown()
+
+    def wait_for_workers(self):
+        if time.time() < self.stop_deadline and any(p.is_alive() for p in self.workers):
+            self.after(100, self.wait_for_workers)
+            return
+        self.finish_shutdown()
+
+    def finish_shutdown(self):
         for p in self.workers: p.terminate()
         self.destroy()
+        for cb in self.on_stopped: cb()
 
 if __name__ == "__main__":
     multiprocessing.freeze_support()
-    app = TuxBench()
-    app.mainloop()
+    if "--scaling" in sys.argv:
+        physical_only = "--physical" in sys.argv
+        try: rows = run_scaling_sweep(physical_only)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(format_scaling_report(rows, physical_only))
+        sys.exit(0)
+    profile_mode = None
+    for arg in sys.argv[1:]:
+        if arg == "--profile": profile_mode = "cprofile"
+        elif arg.startswith("--profile="): profile_mode = arg.split("=", 1)[1]
+    if profile_mode is not None and profile_mode not in PROFILE_MODES:
+        print(f"Error: --profile must be one of {', '.join(PROFILE_MODES)}")
+        sys.exit(1)
+    profile_dir = prepare_profile_dir() if profile_mode else None
+    app = TuxBench(profile_dir, profile_mode)
+    if profile_dir:
+        # Idle Tk waits are wall time, not work, keep them out of the flamegraph
+        collector = run_profiled(profile_mode, app.mainloop, idle_leaf="mainloop")
+        save_profile(profile_dir, "main", collector)
+        report = write_profile_report(profile_dir)
+        if report: print(report)
+        output = "merged.collapsed" if profile_mode == "sample" else "merged.prof"
+        print(f"Profile written to {profile_dir} ({output}, report.txt)")
+    else:
+        app.mainloop()